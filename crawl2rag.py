@@ -2,20 +2,124 @@
 import os
 import sys
 import argparse
+import asyncio
 import yaml
-import requests
+import aiohttp
 import json
-import random
-import time
+import threading
+from functools import lru_cache
+from html import escape as html_escape
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse, urljoin
 import re
 from loguru import logger
-from bs4 import BeautifulSoup
+from aiolimiter import AsyncLimiter
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
 # No longer using FirecrawlApp SDK
 from ragflow_sdk import RAGFlow
 
+# JSON解析优先使用orjson（C实现，解析大响应明显更快），未安装时回退到标准库
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 单个Firecrawl响应体的最大字节数，防御异常超大的返回
+_MAX_RESPONSE_BYTES = 20 * 1024 * 1024
+
+# BeautifulSoup优先使用C实现的lxml解析器，未安装时回退到标准库解析器
+try:
+    import lxml  # noqa: F401
+    _BS4_PARSER = 'lxml'
+except ImportError:
+    _BS4_PARSER = 'html.parser'
+
+# HTML清理优先使用selectolax的Lexbor解析器（C实现的HTML5解析器），未安装时回退到BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _LEXBOR_AVAILABLE = True
+except ImportError:
+    _LEXBOR_AVAILABLE = False
+
+# 清理选择器合并为一个并只编译一次：每页一次DOM遍历，且跳过soupsieve的重复选择器解析
+_CLEANUP_SELECTOR = '.author, .feature_container, .widget-relation, .post-opt'
+_CLEANUP_CLASS_NAMES = ('author', 'feature_container', 'widget-relation', 'post-opt')
+_CLEANUP_PATTERN = soupsieve.compile(_CLEANUP_SELECTOR)
+
+# lxml可用时预编译等价的XPath，供lxml.html清理路径使用（不依赖额外的cssselect包）
+if _BS4_PARSER == 'lxml':
+    import lxml.html as _lxml_html
+    from lxml import etree as _lxml_etree
+    _CLEANUP_XPATH = _lxml_etree.XPath(' | '.join(
+        f"//*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+        for name in _CLEANUP_CLASS_NAMES))
+else:
+    _lxml_html = None
+    _CLEANUP_XPATH = None
+
+# 匹配URL路径中的纯数字段，预编译避免每次保存时重新解析
+_PATH_DIGITS_RE = re.compile(r'(?:^|/)(\d+)(?=/|$)')
+
+
+@lru_cache(maxsize=1024)
+def _article_id_from_url(url: str) -> str:
+    """从URL路径中提取最后一个纯数字段作为文章ID
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        str: 文章ID，提取不到时返回'article'
+    """
+    matches = _PATH_DIGITS_RE.findall(urlparse(url).path)
+    return matches[-1] if matches else 'article'
+
+class _AdaptiveLimiter:
+    """自适应并发限制器（AIMD）：成功时逐步提高并发，遇到限流或超时时减半
+
+    避免固定并发数在Firecrawl负载变化时要么跑不满、要么触发429/超时。
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._inflight = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._inflight < self.limit)
+            self._inflight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self._inflight -= 1
+            self._cond.notify_all()
+
+    async def on_success(self):
+        """请求成功：线性增加并发上限，直到初始最大值"""
+        async with self._cond:
+            if self.limit < self.max_limit:
+                self.limit += 1
+                logger.debug(f'自适应并发上调至 {self.limit}（在途请求 {self._inflight}）')
+                self._cond.notify_all()
+
+    async def on_backoff(self):
+        """请求被限流或超时：并发上限减半，最低降到1"""
+        async with self._cond:
+            new_limit = max(1, self.limit // 2)
+            if new_limit != self.limit:
+                self.limit = new_limit
+                logger.debug(f'自适应并发下调至 {self.limit}（在途请求 {self._inflight}）')
+
+
 class Crawl2RAG:
+    # 日志sink是否已注册（类级别，所有实例共享）
+    _log_configured = False
+
     def __init__(self, config_path: str = "config.yml"):
         """初始化Crawl2RAG实例
 
@@ -35,20 +139,22 @@ class Crawl2RAG:
             if not self.firecrawl_api_key:
                 raise ValueError('Firecrawl API密钥未设置，请在config.yml中设置或设置FIRECRAWL_API_KEY环境变量')
 
-        # 配置输出目录
+        # 配置输出目录（只在初始化时创建一次，保存文件时直接复用）
         self.output_dir = self.config['output']['dir']
-        os.makedirs(self.output_dir, exist_ok=True)
+        self.output_path = os.path.join(os.getcwd(), self.output_dir)
+        os.makedirs(self.output_path, exist_ok=True)
+
+        # jsonl输出模式下的汇总文件句柄，由process在爬取期间打开/关闭
+        self._bundle_file = None
+        self._bundle_path = None
+        self._bundle_lock = threading.Lock()
 
-        # 配置日志
-        logger.add('crawl2rag.log', rotation='10 MB')
+        # 配置日志（只注册一次sink，避免多实例时重复写入同一日志文件）
+        # 文件sink固定为INFO级别，DEBUG日志由--debug专用的sink负责
+        if not Crawl2RAG._log_configured:
+            logger.add('crawl2rag.log', rotation='10 MB', level='INFO')
+            Crawl2RAG._log_configured = True
 
-        # 初始化session
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
-        })
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """加载配置文件
@@ -61,7 +167,8 @@ class Crawl2RAG:
         """
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                # 优先使用libyaml的C实现加载器，未编译时回退到纯Python实现
+                config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
             logger.info(f'成功加载配置文件: {config_path}')
             return config
         except Exception as e:
@@ -80,33 +187,126 @@ class Crawl2RAG:
             str: 保存的文件路径
         """
         try:
-            # 使用配置的输出目录
-            output_dir = os.path.join(os.getcwd(), self.output_dir)
-            os.makedirs(output_dir, exist_ok=True)
-
-            # 从URL中提取文件名
-            parsed_url = urlparse(url)
-            path_parts = parsed_url.path.strip('/').split('/')
+            # 使用初始化时已创建的输出目录
+            output_dir = self.output_path
 
             # 如果提供了页面编号，使用它作为文件名
             if page_num is not None:
                 filename = f"page-{page_num}.md"
             else:
                 # 否则尝试从URL中提取ID
-                article_id = next((part for part in reversed(path_parts) if part.isdigit()), 'article')
-                filename = f"article-{article_id}.md"
+                filename = f"article-{_article_id_from_url(url)}.md"
 
-            # 保存文件
+            # 保存文件，使用1MB写缓冲减少小块写入的系统调用次数
             file_path = os.path.join(output_dir, filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(file_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
                 f.write(content)
-            logger.info(f'内容已保存到文件: {file_path}')
+            logger.debug(f'内容已保存到文件: {file_path}')
             return file_path
 
         except Exception as e:
             logger.error(f'保存Markdown文件时发生错误: {str(e)}')
             raise
 
+    def _append_to_bundle(self, content: str, url: str, page_num: Optional[int]) -> str:
+        """将页面内容以JSONL格式追加到单个汇总文件
+
+        Args:
+            content: 页面内容
+            url: 原始URL
+            page_num: 页面编号（如果有）
+
+        Returns:
+            str: 汇总文件路径
+        """
+        record = json.dumps({'url': url, 'page_num': page_num, 'content': content}, ensure_ascii=False)
+        # 保存操作在线程池中执行，追加写入需要加锁保证行完整
+        with self._bundle_lock:
+            self._bundle_file.write(record + '\n')
+        return self._bundle_path
+
+    def _clean_html(self, content: str, title: str) -> str:
+        """清理HTML内容：移除无关元素并补充标题信息
+
+        Args:
+            content: 原始HTML内容
+            title: 页面标题
+
+        Returns:
+            str: 清理后的HTML内容
+        """
+        # 快速路径：源字符串里不含任何待清理class且已有标题时，页面无需改动，
+        # 直接返回原文，完全跳过解析和重新序列化（子串检查只会漏判、不会误判）
+        if '<title' in content and not any(name in content for name in _CLEANUP_CLASS_NAMES):
+            return content
+
+        # 优先使用Lexbor解析器，清理逻辑与BeautifulSoup路径一致但快一个数量级
+        if _LEXBOR_AVAILABLE:
+            tree = LexborHTMLParser(content)
+
+            # 移除所有 .author .feature_container .widget-relation .post-opt 元素
+            for node in tree.css(_CLEANUP_SELECTOR):
+                node.decompose()
+
+            # Lexbor会自动补全head标签，缺少标题时将其插入head
+            head = tree.css_first('head')
+            if head is not None and head.css_first('title') is None:
+                title_node = LexborHTMLParser(f'<title>{html_escape(title)}</title>').css_first('title')
+                if title_node is not None:
+                    head.insert_child(title_node)
+
+            return tree.html or content
+
+        # 次选lxml.html：drop_tree清理后由libxml2的C序列化器输出，跳过bs4的Python级序列化
+        if _lxml_html is not None:
+            root = _lxml_html.document_fromstring(content)
+            for element in _CLEANUP_XPATH(root):
+                element.drop_tree()
+
+            # 检查并添加标题信息
+            if root.find('.//title') is None:
+                head = root.find('head')
+                if head is None:
+                    head = root.makeelement('head', {})
+                    root.insert(0, head)
+                title_element = head.makeelement('title', {})
+                title_element.text = title
+                head.insert(0, title_element)
+
+            return _lxml_html.tostring(root, encoding='unicode', method='html')
+
+        # 回退到BeautifulSoup：输入带head时必须完整解析，只解析body会丢掉charset、样式等头部信息
+        if '<head' in content:
+            soup = BeautifulSoup(content, _BS4_PARSER)
+        else:
+            # 无head的片段只解析body子树，跳过script等节点的DOM构建
+            soup = BeautifulSoup(content, _BS4_PARSER, parse_only=SoupStrainer('body'))
+            if soup.find('body') is None:
+                # html.parser不会为无body的片段补全标签，此时退回完整解析
+                soup = BeautifulSoup(content, _BS4_PARSER)
+
+        # 移除所有 .author .feature_container .widget-relation .post-opt 元素
+        # 注意：必须先取出完整列表再decompose，惰性遍历会被节点销毁打断
+        for node in _CLEANUP_PATTERN.select(soup):
+            node.decompose()
+
+        # 检查并添加标题信息
+        if not soup.find('head'):
+            # 如果没有 head 标签，创建新的 head 标签
+            head_tag = soup.new_tag('head')
+            title_tag = soup.new_tag('title')
+            title_tag.string = title
+            head_tag.append(title_tag)
+
+            if soup.find('body'):
+                # 如果有 body 标签，在 body 前插入 head
+                soup.body.insert_before(head_tag)
+            else:
+                # 如果没有 body 标签，在开头添加
+                soup.insert(0, head_tag)
+
+        return str(soup)
+
     def _save_to_html(self, content: str, url: str, page_num: Optional[int] = None, title: str = '爬取页面') -> str:
         """将爬取内容保存为html文件
 
@@ -120,62 +320,313 @@ class Crawl2RAG:
             str: 保存的文件路径
         """
         try:
-            # 使用配置的输出目录
-            output_dir = os.path.join(os.getcwd(), self.output_dir)
-            os.makedirs(output_dir, exist_ok=True)
-
-            # 从URL中提取文件名
-            parsed_url = urlparse(url)
-            path_parts = parsed_url.path.strip('/').split('/')
+            # 使用初始化时已创建的输出目录
+            output_dir = self.output_path
 
             # 如果提供了页面编号，使用它作为文件名
             if page_num is not None:
                 filename = f"page-{page_num}.html"
             else:
                 # 否则尝试从URL中提取ID
-                article_id = next((part for part in reversed(path_parts) if part.isdigit()), 'article')
-                filename = f"article-{article_id}.html"
+                filename = f"article-{_article_id_from_url(url)}.html"
 
-            # 使用 BeautifulSoup 处理 HTML 内容
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # 移除所有 .author .feature_container .widget-relation .post-opt 元素
-            for author_element in soup.select('.author'):
-                author_element.decompose()
-            for feature_container in soup.select('.feature_container'):
-                feature_container.decompose()
-            for widget_relation in soup.select('.widget-relation'):
-                widget_relation.decompose()
-            for post_opt in soup.select('.post-opt'):
-                post_opt.decompose()
+            # 清理HTML并补充标题信息
+            cleaned = self._clean_html(content, title)
 
-            # 检查并添加标题信息
-            if not soup.find('head'):
-                # 如果没有 head 标签，创建新的 head 标签
-                head_tag = soup.new_tag('head')
-                title_tag = soup.new_tag('title')
-                title_tag.string = title
-                head_tag.append(title_tag)
-                
-                if soup.find('body'):
-                    # 如果有 body 标签，在 body 前插入 head
-                    soup.body.insert_before(head_tag)
-                else:
-                    # 如果没有 body 标签，在开头添加
-                    soup.insert(0, head_tag)
-
-            # 保存文件
+            # 保存文件，使用1MB写缓冲减少小块写入的系统调用次数
             file_path = os.path.join(output_dir, filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(str(soup))
-            logger.info(f'内容已保存到文件: {file_path}')
+            with open(file_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+                f.write(cleaned)
+            logger.debug(f'内容已保存到文件: {file_path}')
             return file_path
 
         except Exception as e:
             logger.error(f'保存html文件时发生错误: {str(e)}')
             raise
 
-    def process(self, base_url: str, start_page: int = None, end_page: int = None, page_numbers: List[int] = None, wait_min: float = 2.0, wait_max: float = 4.0, output_type: str = 'markdown', timeout: int = 30000) -> Dict[str, Any]:
+    def _process_page_result(self, result: Dict[str, Any], page_num: int, url: str, output_type: str) -> Optional[Dict[str, Any]]:
+        """处理单个页面的爬取结果并保存到文件
+
+        Args:
+            result: Firecrawl API返回的结果
+            page_num: 页面编号
+            url: 原始URL
+            output_type: 输出类型，可选值为 'markdown' 或 'html'
+
+        Returns:
+            Optional[Dict[str, Any]]: 处理后的结果，内容无效时返回None
+        """
+        # 根据输出类型处理内容
+        if output_type == 'markdown' and result['data']['markdown']:
+            markdown_content = result['data']['markdown']
+            content_preview = markdown_content[:100] + '...' if len(markdown_content) > 100 else markdown_content
+            logger.debug(f'获取到Markdown内容预览: {content_preview}')
+
+            # 保存为Markdown文件（jsonl模式下追加到汇总文件）
+            if self._bundle_file is not None:
+                file_path = self._append_to_bundle(markdown_content, url, page_num)
+            else:
+                file_path = self._save_to_markdown(markdown_content, url, page_num)
+
+            # 只保留文件路径，不在内存中持有整页内容
+            result['page_num'] = page_num
+            result['file_path'] = file_path
+            result['markdown_path'] = file_path
+            del result['data']
+
+            logger.info(f'页面 {page_num} Markdown内容保存成功')
+            return result
+
+        elif output_type == 'html' and result['data']['html']:
+            html_content = result['data']['html']
+            html_content_preview = html_content[:100] + '...' if len(html_content) > 100 else html_content
+            logger.debug(f'获取到HTML内容预览: {html_content_preview}')
+
+            # 获取标题
+            title = result['data']['metadata']['title'].split('|')[0]
+
+            # 保存为HTML文件（jsonl模式下清理后追加到汇总文件）
+            if self._bundle_file is not None:
+                file_path = self._append_to_bundle(self._clean_html(html_content, title), url, page_num)
+            else:
+                file_path = self._save_to_html(html_content, url, page_num, title)
+
+            # 只保留文件路径，不在内存中持有整页内容
+            result['page_num'] = page_num
+            result['file_path'] = file_path
+            result['html_path'] = file_path
+            del result['data']
+
+            logger.info(f'页面 {page_num} HTML内容保存成功')
+            return result
+        else:
+            logger.warning(f'页面 {page_num} 爬取成功但未能提取{output_type}格式的有效内容')
+            # 记录响应结构，以便调试
+            logger.warning(f'响应结构: {", ".join(result.keys())}')
+            # 响应内容摘要只在DEBUG级别启用时才构建，且总长度有上限
+            logger.opt(lazy=True).debug(
+                '响应内容摘要: {summary}',
+                summary=lambda: json.dumps(
+                    {k: str(v)[:100] + '...' if isinstance(v, str) and len(v) > 100 else v
+                     for k, v in result.items()},
+                    ensure_ascii=False, default=str)[:2000])
+            return None
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, page_num: int, url: str,
+                          sem: '_AdaptiveLimiter', limiter: AsyncLimiter,
+                          payload_template: Dict[str, Any], output_type: str) -> Optional[Dict[str, Any]]:
+        """并发爬取单个页面
+
+        Args:
+            session: aiohttp会话
+            page_num: 页面编号
+            url: 完整URL
+            sem: 自适应并发限制器
+            limiter: 全局请求速率限制器
+            payload_template: 请求数据模板，每个页面只替换url字段
+            output_type: 输出类型，可选值为 'markdown' 或 'html'
+
+        Returns:
+            Optional[Dict[str, Any]]: 爬取结果，失败时返回None
+        """
+        async with sem, limiter:
+            try:
+                logger.info(f'开始爬取页面 {page_num}: {url}')
+
+                # 复用请求数据模板，只替换URL
+                payload = {**payload_template, "url": url}
+
+                logger.debug(f'请求Firecrawl API: {self.firecrawl_api_url}')
+                logger.opt(lazy=True).debug('请求数据: {payload}',
+                                             payload=lambda: json.dumps(payload, ensure_ascii=False))
+
+                # 发送请求
+                async with session.post(self.firecrawl_api_url, json=payload) as response:
+                    # 记录响应状态
+                    logger.debug(f'响应状态码: {response.status}')
+
+                    # 先检查状态码，出错时只读取少量内容用于日志，不解析完整响应体
+                    if response.status >= 400:
+                        error_body = await response.content.read(2048)
+                        logger.error(f'错误响应内容: {error_body[:500]!r}')
+                        response.raise_for_status()
+
+                    # 增量读取响应体并限制最大大小
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(1 << 16):
+                        body.extend(chunk)
+                        if len(body) > _MAX_RESPONSE_BYTES:
+                            raise ValueError(f'页面 {page_num} 响应体超过 {_MAX_RESPONSE_BYTES} 字节上限')
+
+                    # 解析响应
+                    result = _json_loads(bytes(body))
+
+                logger.debug(f'通过API调用成功爬取页面 {page_num}')
+                await sem.on_success()
+
+            except aiohttp.ClientResponseError as req_err:
+                # 处理请求相关错误，限流和服务端错误时降低并发
+                logger.error(f'爬取页面 {page_num} 时发生请求错误: {str(req_err)}')
+                logger.error(f'错误响应状态码: {req_err.status}')
+                if req_err.status in (429, 500, 502, 503, 504):
+                    await sem.on_backoff()
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+                # 连接级错误和超时同样视为过载信号
+                logger.error(f'爬取页面 {page_num} 时发生请求错误: {str(req_err)}')
+                await sem.on_backoff()
+                return None
+            except json.JSONDecodeError as json_err:
+                # 处理JSON解析错误
+                logger.error(f'爬取页面 {page_num} 时JSON解析错误: {str(json_err)}')
+                return None
+            except Exception:
+                # 处理其他错误，由loguru自动附带当前异常堆栈
+                logger.exception(f'爬取页面 {page_num} 时发生错误')
+                return None
+
+        # 磁盘写入通过线程池执行，避免阻塞事件循环
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._process_page_result, result, page_num, url, output_type)
+        except Exception as e:
+            logger.error(f'处理页面 {page_num} 结果时发生错误: {str(e)}')
+            return None
+
+    async def _crawl_pages(self, base_url: str, pages_to_process, wait_min: float, wait_max: float,
+                           output_type: str, timeout: int, concurrency: int) -> List[Dict[str, Any]]:
+        """并发爬取多个页面
+
+        Args:
+            base_url: 基础URL
+            pages_to_process: 要处理的页码序列
+            wait_min: 发起请求前的最小等待时间（秒）
+            wait_max: 发起请求前的最大等待时间（秒）
+            output_type: 输出类型，可选值为 'markdown' 或 'html'
+            timeout: 请求超时时间（毫秒）
+            concurrency: 最大并发请求数
+
+        Returns:
+            List[Dict[str, Any]]: 爬取成功的页面结果列表
+        """
+        sem = _AdaptiveLimiter(concurrency)
+        # 用令牌桶按平均速率限流：等待时间与请求重叠，而不是每个请求前空等
+        mean_wait = max((wait_min + wait_max) / 2, 0.001)
+        limiter = AsyncLimiter(max_rate=1, time_period=mean_wait)
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency, keepalive_timeout=60)
+        # 客户端超时略大于传给Firecrawl的抓取超时，确保卡住的请求及时失败并释放并发额度
+        client_timeout = aiohttp.ClientTimeout(total=timeout / 1000 + 30)
+        # 认证头和请求数据模板只构建一次，所有页面复用
+        headers = {
+            "Authorization": f"Bearer {self.firecrawl_api_key}",
+            "Content-Type": "application/json"
+        }
+        payload_template = {
+            "url": None,
+            "formats": ['html'],  # 同时请求两种格式
+            "timeout": timeout  # 使用传入的超时时间
+        }
+
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=client_timeout) as session:
+            tasks = [
+                self._fetch_page(session, page_num, f"{base_url}{page_num}", sem,
+                                 limiter, payload_template, output_type)
+                for page_num in pages_to_process
+            ]
+            results = await asyncio.gather(*tasks)
+
+        return [result for result in results if result is not None]
+
+    async def _crawl_pages_batched(self, base_url: str, pages_to_process, output_type: str,
+                                   timeout: int, batch_size: int) -> List[Dict[str, Any]]:
+        """通过Firecrawl批量接口一次提交多个URL，轮询任务完成后统一处理
+
+        Args:
+            base_url: 基础URL
+            pages_to_process: 要处理的页码序列
+            output_type: 输出类型，可选值为 'markdown' 或 'html'
+            timeout: 请求超时时间（毫秒）
+            batch_size: 每个批量任务包含的URL数量
+
+        Returns:
+            List[Dict[str, Any]]: 爬取成功的页面结果列表
+        """
+        # 从scrape端点推导批量端点，例如 /v1/scrape -> /v1/batch/scrape
+        batch_endpoint = self.firecrawl_api_url.replace('/scrape', '/batch/scrape')
+        headers = {
+            "Authorization": f"Bearer {self.firecrawl_api_key}",
+            "Content-Type": "application/json"
+        }
+
+        pages = list(pages_to_process)
+        crawl_results = []
+        loop = asyncio.get_running_loop()
+
+        async with aiohttp.ClientSession(headers=headers) as session:
+            for i in range(0, len(pages), batch_size):
+                batch = pages[i:i + batch_size]
+                urls = [f"{base_url}{page_num}" for page_num in batch]
+                url_to_page = dict(zip(urls, batch))
+                payload = {"urls": urls, "formats": ['html'], "timeout": timeout}
+
+                try:
+                    logger.info(f'提交批量爬取任务: 页面 {batch[0]} - {batch[-1]}（共{len(batch)}个）')
+                    async with session.post(batch_endpoint, json=payload) as response:
+                        response.raise_for_status()
+                        job = await response.json(loads=_json_loads)
+
+                    # 轮询任务状态直到完成；按抓取超时推算轮询截止时间，避免接口异常时死循环
+                    status_url = job.get('url') or f"{batch_endpoint}/{job.get('id')}"
+                    poll_deadline = loop.time() + timeout / 1000 * len(batch) + 60
+                    job_state = None
+                    while True:
+                        await asyncio.sleep(2)
+                        async with session.get(status_url) as response:
+                            response.raise_for_status()
+                            status = await response.json(loads=_json_loads)
+                        job_state = status.get('status')
+                        if job_state == 'completed':
+                            break
+                        if job_state not in ('scraping', 'processing'):
+                            # failed/cancelled以及缺失或未知的状态一律按失败处理
+                            logger.error(f'批量爬取任务未完成，状态: {job_state}')
+                            break
+                        if loop.time() >= poll_deadline:
+                            logger.error(f'批量爬取任务轮询超时，最后状态: {job_state}')
+                            break
+                        logger.debug(f'批量任务进度: {status.get("completed", 0)}/{status.get("total", len(batch))}')
+
+                    # 收集完整结果：结果较多时接口会通过next字段分页返回
+                    items = []
+                    next_url = None
+                    if job_state == 'completed':
+                        items.extend(status.get('data') or [])
+                        next_url = status.get('next')
+                    while next_url:
+                        async with session.get(next_url) as response:
+                            response.raise_for_status()
+                            status_page = await response.json(loads=_json_loads)
+                        items.extend(status_page.get('data') or [])
+                        next_url = status_page.get('next')
+
+                    # 按来源URL把结果映射回页码并逐页保存
+                    for item in items:
+                        metadata = item.get('metadata') or {}
+                        page_url = metadata.get('sourceURL') or metadata.get('url')
+                        page_num = url_to_page.get(page_url)
+                        processed = await loop.run_in_executor(
+                            None, self._process_page_result, {'data': item}, page_num, page_url, output_type)
+                        if processed is not None:
+                            crawl_results.append(processed)
+
+                except aiohttp.ClientError as req_err:
+                    logger.error(f'批量爬取页面 {batch[0]} - {batch[-1]} 时发生请求错误: {str(req_err)}')
+                except Exception:
+                    logger.exception(f'批量爬取页面 {batch[0]} - {batch[-1]} 时发生错误')
+
+        return crawl_results
+
+    def process(self, base_url: str, start_page: int = None, end_page: int = None, page_numbers: List[int] = None, wait_min: float = 2.0, wait_max: float = 4.0, output_type: str = 'markdown', timeout: int = 30000, concurrency: int = 4, batch_size: int = 0, output_mode: str = 'per-page') -> Dict[str, Any]:
         """处理完整流程：爬取页面并上传到RAGFlow
 
         Args:
@@ -187,6 +638,9 @@ class Crawl2RAG:
             wait_max: 爬取页面之间的最大等待时间（秒）
             output_type: 输出类型，可选值为 'markdown' 或 'html'
             timeout: 请求超时时间（毫秒）
+            concurrency: 最大并发请求数
+            batch_size: 每个Firecrawl批量任务包含的URL数量，0表示逐页爬取
+            output_mode: 输出模式，'per-page'为每页一个文件，'jsonl'为单个汇总文件
 
         Returns:
             Dict[str, Any]: 处理结果
@@ -195,6 +649,8 @@ class Crawl2RAG:
             # 验证输出类型
             if output_type not in ['markdown', 'html']:
                 raise ValueError("输出类型必须是 'markdown' 或 'html'")
+            if output_mode not in ['per-page', 'jsonl']:
+                raise ValueError("输出模式必须是 'per-page' 或 'jsonl'")
 
             # 确定要处理的页码列表
             if page_numbers is not None:
@@ -204,136 +660,43 @@ class Crawl2RAG:
                     raise ValueError("当未提供page_numbers时，start_page和end_page都是必需的")
                 pages_to_process = range(start_page, end_page + 1)
 
-            # 爬取页面
-            crawl_results = []
-            for page_num in pages_to_process:
-                # 如果不是第一个页面，随机等待指定范围内的时间
-                if len(crawl_results) > 0:
-                    wait_time = random.uniform(wait_min, wait_max)
-                    logger.info(f'随机等待 {wait_time:.2f} 秒后继续爬取下一个页面')
-                    time.sleep(wait_time)
-
-                # 构建完整URL
-                url = f"{base_url}{page_num}"
+            # 总页数只计算一次；range的len是O(1)，不会物化页码列表
+            total_pages = len(pages_to_process)
 
-                try:
-                    logger.info(f'开始爬取页面 {page_num}: {url}')
+            # jsonl模式：整个爬取期间只打开一个汇总文件，N次小文件写合并为一个顺序流
+            if output_mode == 'jsonl':
+                self._bundle_path = os.path.join(self.output_path, 'output.jsonl')
+                self._bundle_file = open(self._bundle_path, 'w', encoding='utf-8', buffering=1024 * 1024)
 
-                    # 直接调用Firecrawl API爬取页面
-                    api_endpoint = self.firecrawl_api_url
-
-                    logger.info(f'Firecrawl API URL: {self.firecrawl_api_url}')
-                    logger.info(f'构建的API端点: {api_endpoint}')
-
-                    headers = {
-                        "Authorization": f"Bearer {self.firecrawl_api_key}",
-                        "Content-Type": "application/json"
-                    }
-
-                    # 构建请求数据
-                    payload = {
-                        "url": url,
-                        "formats": ['html'],  # 同时请求两种格式
-                        "timeout": timeout  # 使用传入的超时时间
-                    }
-
-                    logger.info(f'请求Firecrawl API: {api_endpoint}')
-                    logger.info(f'请求头: {headers}')
-                    logger.info(f'请求数据: {json.dumps(payload, ensure_ascii=False)}')
-
-                    # 发送请求
-                    response = requests.post(api_endpoint, json=payload, headers=headers)
-
-                    # 记录响应状态和头信息
-                    logger.info(f'响应状态码: {response.status_code}')
-                    logger.info(f'响应头: {dict(response.headers)}')
-
-                    # 确保请求成功
-                    response.raise_for_status()
-
-                    # 解析响应
-                    result = response.json()
-
-                    logger.info(f'通过API调用成功爬取页面 {page_num}')
-
-                    # 根据输出类型处理内容
-                    if output_type == 'markdown' and result['data']['markdown']:
-                        markdown_content = result['data']['markdown']
-                        content_preview = markdown_content[:100] + '...' if len(markdown_content) > 100 else markdown_content
-                        logger.info(f'获取到Markdown内容预览: {content_preview}')
-                        
-                        # 保存为Markdown文件
-                        file_path = self._save_to_markdown(markdown_content, url, page_num)
-                        
-                        result['page_num'] = page_num
-                        result['file_path'] = file_path
-                        result['markdown'] = markdown_content
-                        crawl_results.append(result)
-                        
-                        logger.info(f'页面 {page_num} Markdown内容保存成功')
-                    
-                    elif output_type == 'html' and result['data']['html']:
-                        html_content = result['data']['html']
-                        html_content_preview = html_content[:100] + '...' if len(html_content) > 100 else html_content
-                        logger.info(f'获取到HTML内容预览: {html_content_preview}')
-                        
-                        # 获取标题
-                        title = result['data']['metadata']['title'].split('|')[0]
-                        
-                        # 保存为HTML文件
-                        file_path = self._save_to_html(html_content, url, page_num, title)
-                        
-                        result['page_num'] = page_num
-                        result['file_path'] = file_path
-                        result['html'] = html_content
-                        crawl_results.append(result)
-                        
-                        logger.info(f'页面 {page_num} HTML内容保存成功')
-                    else:
-                        logger.warning(f'页面 {page_num} 爬取成功但未能提取{output_type}格式的有效内容')
-                        # 记录响应结构，以便调试
-                        logger.warning(f'响应结构: {json.dumps(list(result.keys()), ensure_ascii=False)}')
-                        # 记录部分响应内容
-                        truncated_result = {k: str(v)[:100] + '...' if isinstance(v, str) and len(v) > 100 else v
-                                           for k, v in result.items()}
-                        logger.warning(f'响应内容摘要: {json.dumps(truncated_result, ensure_ascii=False, indent=2)}')
-
-                except requests.RequestException as req_err:
-                    # 处理请求相关错误
-                    logger.error(f'爬取页面 {page_num} 时发生请求错误: {str(req_err)}')
-                    if hasattr(req_err, 'response') and req_err.response is not None:
-                        # 记录响应状态码和内容
-                        logger.error(f'错误响应状态码: {req_err.response.status_code}')
-                        try:
-                            error_content = req_err.response.json()
-                            logger.error(f'错误响应内容: {json.dumps(error_content, ensure_ascii=False)}')
-                        except:
-                            logger.error(f'错误响应内容: {req_err.response.text[:500]}...')
-                    continue
-                except json.JSONDecodeError as json_err:
-                    # 处理JSON解析错误
-                    logger.error(f'爬取页面 {page_num} 时JSON解析错误: {str(json_err)}')
-                    logger.error(f'响应内容: {response.text[:500]}...')
-                    continue
-                except Exception as e:
-                    # 处理其他错误
-                    logger.error(f'爬取页面 {page_num} 时发生错误: {str(e)}')
-                    import traceback
-                    logger.error(f'错误详情: {traceback.format_exc()}')
-                    continue
+            try:
+                # 并发爬取页面；指定batch_size时改用Firecrawl批量接口，分摊每请求开销
+                if batch_size > 0:
+                    crawl_results = asyncio.run(self._crawl_pages_batched(
+                        base_url, pages_to_process, output_type, timeout, batch_size))
+                else:
+                    crawl_results = asyncio.run(self._crawl_pages(
+                        base_url, pages_to_process, wait_min, wait_max, output_type, timeout, concurrency))
+            finally:
+                if self._bundle_file is not None:
+                    # 只在收尾时刷盘一次
+                    self._bundle_file.flush()
+                    os.fsync(self._bundle_file.fileno())
+                    self._bundle_file.close()
+                    self._bundle_file = None
+                    logger.info(f'所有页面已汇总到文件: {self._bundle_path}')
 
             # 根据输出类型过滤结果
             filtered_results = []
             for result in crawl_results:
-                if output_type == 'markdown' and 'markdown' in result:
+                if output_type == 'markdown' and 'markdown_path' in result:
                     filtered_results.append(result)
-                elif output_type == 'html' and 'html' in result:
+                elif output_type == 'html' and 'html_path' in result:
                     filtered_results.append(result)
 
             return {
                 'status': 'success',
                 'crawled_pages': len(filtered_results),
-                'total_pages': len(pages_to_process),
+                'total_pages': total_pages,
                 'output_type': output_type
             }
 
@@ -366,6 +729,13 @@ def main():
                         help='输出类型，可选值为 markdown 或 html，默认为 markdown')
     parser.add_argument('--timeout', type=int, default=30000,
                         help='请求超时时间（毫秒），默认为30000毫秒（30秒）')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='同时爬取的最大页面数，默认为4')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='每个Firecrawl批量任务包含的URL数量，默认为0（逐页爬取）')
+    parser.add_argument('--output-mode', type=str, default='per-page',
+                        choices=['per-page', 'jsonl'],
+                        help="输出模式，per-page为每页一个文件，jsonl为单个汇总文件，默认为per-page")
 
     args = parser.parse_args()
 
@@ -376,6 +746,10 @@ def main():
             logger.add(sys.stderr, level="DEBUG")
             logger.add("crawl2rag_debug.log", level="DEBUG", rotation="10 MB")
             logger.debug("调试模式已启用")
+        else:
+            # 默认处理器是DEBUG级别，替换为INFO，否则热路径上的debug日志照常求值输出
+            logger.remove()
+            logger.add(sys.stderr, level="INFO")
 
         # 初始化Crawl2RAG
         crawler = Crawl2RAG(config_path=args.config)
@@ -407,7 +781,10 @@ def main():
             wait_min=args.wait_min,
             wait_max=args.wait_max,
             output_type=args.type,
-            timeout=args.timeout
+            timeout=args.timeout,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            output_mode=args.output_mode
         )
 
         # 输出结果
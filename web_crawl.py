@@ -11,6 +11,9 @@ import re
 import time
 
 class WebCrawler:
+    # 日志sink是否已注册（类级别，所有实例共享）
+    _log_configured = False
+
     def __init__(self, api_key: Optional[str] = None):
         """初始化WebCrawler实例
 
@@ -28,8 +31,10 @@ class WebCrawler:
         # 初始化FirecrawlApp
         self.app = FirecrawlApp(api_key=self.api_key)
         
-        # 配置日志
-        logger.add('crawler.log', rotation='10 MB')
+        # 配置日志（只注册一次sink，避免多实例时重复写入同一日志文件）
+        if not WebCrawler._log_configured:
+            logger.add('crawler.log', rotation='10 MB')
+            WebCrawler._log_configured = True
         
         # 初始化session
         self.session = requests.Session()
@@ -45,6 +50,9 @@ class WebCrawler:
         self.password = os.getenv('CSDN_PASSWORD')
         self.cookie = os.getenv('CSDN_COOKIE')
         self.output_dir = os.getenv('OUTPUT_DIR', 'output')
+        # 输出目录只在初始化时创建一次，保存文件时直接复用
+        self.output_path = os.path.join(os.getcwd(), self.output_dir)
+        os.makedirs(self.output_path, exist_ok=True)
 
         # 设置cookie
         if self.cookie:
@@ -61,12 +69,10 @@ class WebCrawler:
         Returns:
             Dict[str, str]: Cookie字典
         """
-        cookie_dict = {}
-        for item in cookie_str.split(';'):
-            if '=' in item:
-                name, value = item.strip().split('=', 1)
-                cookie_dict[name] = value
-        return cookie_dict
+        return dict(
+            item.strip().split('=', 1)
+            for item in cookie_str.split(';') if '=' in item
+        )
 
     def _save_to_markdown(self, content: str, url: str) -> str:
         """将爬取内容保存为Markdown文件
@@ -79,20 +85,23 @@ class WebCrawler:
             str: 保存的文件路径
         """
         try:
-            # 使用配置的输出目录
-            output_dir = os.path.join(os.getcwd(), self.output_dir)
-            os.makedirs(output_dir, exist_ok=True)
+            # 使用初始化时已创建的输出目录
+            output_dir = self.output_path
 
             # 从URL中提取文件名
             parsed_url = urlparse(url)
             path_parts = parsed_url.path.strip('/').split('/')
             # 对于CSDN文章，使用文章ID作为文件名
-            article_id = next((part for part in reversed(path_parts) if part.isdigit()), 'article')
+            article_id = 'article'
+            for part in reversed(path_parts):
+                if part.isdigit():
+                    article_id = part
+                    break
             filename = f"csdn-{article_id}.md"
 
-            # 保存文件
+            # 保存文件，使用1MB写缓冲减少小块写入的系统调用次数
             file_path = os.path.join(output_dir, filename)
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with open(file_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
                 f.write(content)
             logger.info(f'内容已保存到文件: {file_path}')
             return file_path